@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class KyksConfig(AppConfig):
     name = 'kyks'
+
+    def ready(self):
+        # The auth forms can only be imported once the user model is loaded.
+        # Importing them here avoids paying for the import on the first request
+        # and makes auth.forms available to Users.login.
+        import django.contrib.auth.forms
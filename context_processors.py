@@ -3,11 +3,17 @@ from .models import Status, Styles, Kyks
 
 #======================================================================================================================
 
+KYKS_CONTEXT = {'Styles': Styles,
+                'Status': Status,
+                'Kyks': Kyks,
+                }
+# Django copies the output of context processors into the context,
+# so the same dict can be returned for every request.
+
 def kyks(request):
     """
     Includes certain parameters by default in all RequestContext instances.    
     """ 
-    return {'Styles': Styles,
-            'Status': Status,
-            'Kyks': Kyks,
-            }
\ No newline at end of file
+    return KYKS_CONTEXT
+
+#======================================================================================================================
@@ -15,7 +15,7 @@ class Redirection(Exception):
     The first argument can be an url, a view or a model object (whose get_absolute_url method will be invoked).    
     """
     def __init__(self, *args, **kwargs):
-        self.args = args
+        super().__init__(*args)
         self.kwargs = kwargs
 
 
@@ -27,7 +27,7 @@ class PermanentRedirection(Redirection):
     Intended to be called from inside a kyk template.
     """
     def __init__(self, *args, **kwargs):
-        super(self, PermanentRedirection).__init__(permanent=True, *args, **kwargs)
+        super().__init__(*args, permanent=True, **kwargs)
 
 
 #======================================================================================================================
@@ -37,6 +37,7 @@ class Reload(Exception):
     Exception that processes the request again but using a different kyk as page kyk,
     and optionally a given template (otherwise Templates.PAGE will be used).
     """
+    as_get = False # Should the request be handled as a 'GET' when reloading?
 
     def __init__(self, kyk=None, template=''):
         self.kyk = kyk
@@ -56,6 +57,7 @@ class ReloadAsGet(Reload):
     The first argument should be the request object (this porbably will have changed,
     due to login, logout or changemood).    
     """
+    as_get = True
 
 
 #======================================================================================================================
@@ -1,3 +1,5 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
 from django.shortcuts import redirect
 
 from .exceptions import Redirection
@@ -7,12 +9,25 @@ from .models.users import set_user_status
 #======================================================================================================================
 
 class SimpleMiddleware(object):
+    """
+    Middleware that can be used in both WSGI (sync) and ASGI (async) deployments,
+    such that Django does not have to adapt it with a thread for every request.
+    Subclasses that override __call__ should override __acall__ as well.
+    """
+
+    sync_capable = True
+    async_capable = True
 
     def __init__(self, get_response):
         self.get_response = get_response
         # One-time configuration and initialization.
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
         # Code to be executed for each request before
         # the view (and later middleware) are called.
         # ...
@@ -23,6 +38,10 @@ class SimpleMiddleware(object):
         # ...
         return response
 
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        return response
+
 
 #======================================================================================================================
 
@@ -49,12 +68,31 @@ class KykMiddleware(SimpleMiddleware):
     Include this class in MIDDLEWARE in settings.py, after
         'django.contrib.sessions.middleware.SessionMiddleware' and
         'django.contrib.auth.middleware.AuthenticationMiddleware'!
+
+    Requests for static and media files (if served by Django) are passed on untouched.
     """
 
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        # Unset urls are skipped: settings returns them as the script prefix (e.g. '/'), 
+        # which would match every path.
+        self.skipped_paths = tuple(url for url in (settings.STATIC_URL, settings.MEDIA_URL) 
+                                   if url and url != '/')
+
     def __call__(self, request):
-        set_user_status(request.user, request.session)
+        if self.async_mode:
+            return self.__acall__(request)
+        if not request.path.startswith(self.skipped_paths):
+            set_user_status(request.user, request.session)
         response = self.get_response(request)
         return response
 
+    async def __acall__(self, request):
+        if not request.path.startswith(self.skipped_paths):
+            # Loading the user and the session may hit the database, which has to be done synchronously.
+            await sync_to_async(set_user_status)(request.user, request.session)
+        response = await self.get_response(request)
+        return response
+
 
 #======================================================================================================================
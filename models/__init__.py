@@ -1,11 +1,20 @@
 from .base import (ParameterDict, Status, Styles, Templates, Kyks, 
                    KykBase, KykList, KykSimple,
                    )
-from .actions import simple_action, Action, ButtonAction, AuthorAction, KykGetButton, KykPostButton
+from .actions import simple_action, Action, ButtonAction, AuthorAction, KykGetButton, KykButtonGroup, KykPostButton
 from .kykmodel import KykModel
 from .users import AbstractKykUser, KykUser, Users, set_user_status, login, logout
 
 Kyks['users'] = Users()
 
+__all__ = [
+    'ParameterDict', 'Status', 'Styles', 'Templates', 'Kyks', 'KykBase', 'KykList', 'KykSimple',
+    'simple_action', 'Action', 'ButtonAction', 'AuthorAction', 'KykGetButton', 'KykButtonGroup', 'KykPostButton',
+    'KykModel',
+    'AbstractKykUser', 'KykUser', 'Users', 'set_user_status', 'login', 'logout',
+    ]
+# The submodules are not loaded lazily: Django needs KykUser to be registered
+# as soon as kyks.models is imported, and the users module depends on all the others.
+
 
 #======================================================================================================================
@@ -1,5 +1,9 @@
-from django.utils import html
+from functools import lru_cache
+from urllib.parse import quote
+
 from django.utils.functional import cached_property
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy
 
 from ..utils import do_not_call_in_templates
@@ -9,23 +13,53 @@ from .base import Status, Templates, KykBase
 
 #======================================================================================================================
 
+@lru_cache(maxsize=256)
 def url_with_get(action, code, *, url='.'):
-    return "{}/?{}={}".format(url.rstrip('/'), action, code)
+    return f"{url.rstrip('/')}/?{quote(action, safe='')}={quote(str(code), safe='')}"
+    # Buttons on list pages repeat the same urls, hence the cache.
 
 
 #----------------------------------------------------------------------------------------------------------------------
 
+@lru_cache(maxsize=None)
+def default_label(action):
+    """
+    Returns a translatable label derived from the name of an action.
+    """
+    return gettext_lazy(action.replace('_', ' ').title())
+    # gettext_lazy translates the string when it is rendered, so the lazy object can be reused.
+
+
+#----------------------------------------------------------------------------------------------------------------------
+
+GET_BUTTON_TEMPLATE = '<a class="button {}" href="{}">{}</a>'
+
 def KykGetButton(action, code, label=None, *, url='.', design=''):
     """
     Creates a string that displays a GET button with a given label that produces a GET request with query ?action=code.
     This can be used as the return result for kyk actions.
     """
-    template_string = '<a class="button {}" href="{}">{}</a>'
     complete_url = url_with_get(action, code, url=url)
     if label is None:
-        label = gettext_lazy(action.replace('_', ' ').title()) 
-        # gettext_lazy translates the string
-    return html.format_html(template_string, design, complete_url, label)
+        label = default_label(action)
+    return mark_safe(GET_BUTTON_TEMPLATE.format(
+        conditional_escape(design), conditional_escape(complete_url), conditional_escape(label)))
+    # This is equivalent to html.format_html(GET_BUTTON_TEMPLATE, design, complete_url, label)
+    # without the overhead of format_html's argument processing.
+
+
+#----------------------------------------------------------------------------------------------------------------------
+
+def KykButtonGroup(items, *, url='.', design=''):
+    """
+    Creates a string that displays a row of GET buttons, one for each (action, code, label) triple in items,
+    as a single safe string. A label can be None, in which case it is derived from the action name.
+    """
+    design = conditional_escape(design)
+    return mark_safe(''.join([
+        GET_BUTTON_TEMPLATE.format(design, conditional_escape(url_with_get(action, code, url=url)), 
+                                   conditional_escape(default_label(action) if label is None else label))
+        for action, code, label in items]))
 
 
 #======================================================================================================================
@@ -49,7 +83,7 @@ def simple_action(status=None):
     def decorator(method):
         if status is not None:
             method.kyk_STATUS = status
-            method.kyk_allowed = lambda user: user.status >= method.kyk_STATUS
+            method.kyk_allowed = lambda user: user.status >= status
         return do_not_call_in_templates(method)
     return decorator
 
@@ -78,8 +112,15 @@ class Action(KykBase):
             return self.kyk.kyk_STATUS
           
     def __get__(self, instance, cls=None):
-        self.kyk = instance if instance and self.kyk_is_instance else cls
-        return self
+        """
+        Returns a copy of the action with its kyk attribute set to the instance (or to the class
+        for classmethods) through which it was accessed. The action itself is never modified,
+        so it can safely be shared by concurrent requests.
+        """
+        bound = object.__new__(type(self))
+        vars(bound).update(vars(self))
+        bound.kyk = instance if instance and self.kyk_is_instance else cls
+        return bound
 
     @classmethod
     def apply(cls, *args, **kwargs):
@@ -146,7 +187,11 @@ class ButtonAction(Action):
     def __init__(self, status=None, name='', label=''):
         super().__init__(status=status)  
         self.name = name
-        self._label = label
+        self.label = label
+        # The functions behind the button and result actions are fetched once,
+        # such that kyk_in does not have to go through the Action descriptors on every call.
+        self._button_func = type(self).button.func
+        self._result_func = type(self).result.func
 
     @classmethod
     def apply(cls, *args, **kwargs):
@@ -164,32 +209,32 @@ class ButtonAction(Action):
             action.func = method if action.kyk_is_instance else method.__func__
             if not action.name:
                 action.name = action.func.__name__
+            if not action.label:
+                action.label = action.name.replace('_', ' ').title()
             return action
         return decorator
     
-    @cached_property
-    def label(self):
-        return self._label or self.name.replace('_', ' ').title()
-
     @property
     def submitter(self):
-        return '{}-{}'.format(self.kyk.kyk_identifier, self.name)
+        return f'{self.kyk.kyk_identifier}-{self.name}'
   
     def get_stage(self, request):
-        if (request.method == 'GET') and (request.GET.get(self.name) == self.kyk.kyk_identifier):
-            stage = self.PRESENT_FORM
-        elif (request.method == 'POST') and (self.submitter in request.POST):
-            stage = self.PROCESS_FORM
-        else:
-            stage = self.PRESENT_BUTTON
-        return stage
+        method = request.method
+        if method == 'GET':
+            # The most common case: the action was not activated, or activated through a GET button.
+            if request.GET.get(self.name) == self.kyk.kyk_identifier:
+                return self.PRESENT_FORM
+        elif method == 'POST':
+            if f'{self.kyk.kyk_identifier}-{self.name}' in request.POST:
+                return self.PROCESS_FORM
+        return self.PRESENT_BUTTON
 
     def kyk_in(self, request, stage=0, design='', *args, **kwargs):
         stage = stage or self.get_stage(request)
         if stage <= self.PRESENT_BUTTON:
-            return self.button.func(self, request, stage=stage, design=design)
+            return self._button_func(self, request, stage=stage, design=design)
         else:
-            return self.result.func(self, request, stage=0, *args, **kwargs)
+            return self._result_func(self, request, stage=0, *args, **kwargs)
             # For backwards compatibility the stage parameter was left out.
 #            return self.result(request, stage=stage, *args, **kwargs)
                 
@@ -257,14 +302,8 @@ class AuthorAction(Action):
         """
         Check whether the user has sufficient status to access self (returns True or False).
         """
-        required_status = self.kyk_STATUS
-        try:
-            author = getattr(self._intance, self.AUTHOR_FIELD)
-        except AttributeError:
-            pass
-        else:
-            if user == author:
-                required_status = self.AUTHOR_STATUS
+        author = getattr(self.kyk, self.AUTHOR_FIELD, None)
+        required_status = self.AUTHOR_STATUS if author is not None and user == author else self.kyk_STATUS
         return user.status >= required_status
  
         
@@ -1,7 +1,10 @@
+from operator import itemgetter
+
 from django.conf import settings
 from django.template import Template
 from django.urls import reverse
-from django.utils.functional import cached_property
+
+from ..utils import template_from_string
 
 
 #======================================================================================================================
@@ -17,30 +20,98 @@ class ParameterDict(dict):
         if args:
             kwargs.update({key:i+1 for i, key in enumerate(args)})
         super().__init__(kwargs)
+        self._attributes = set() # Names of the parameters that are stored as instance attributes.
+        self._update()
+        # value2key maps values to keys.
+        # This can be useful when one wants to store parameters in the database:
+        # it is safer to store the keys than to store the values because they are less likely to change.
+
+    _DERIVED = frozenset(('_attributes', 'value2key', '_sorted_items', '_choices'))
+
+    def _update(self):
+        """
+        Recomputes the attributes that are derived from the items.
+        Every method that changes the items should call this.
+        """
+        # The parameters are stored as instance attributes as well, such that attribute access
+        # does not have to go through __getattr__. Names of dict methods are not overwritten.
+        attributes = vars(self)
+        # When unpickling, the items are set before the instance attributes are restored.
+        for key in attributes.get('_attributes', set()).difference(self):
+            del attributes[key]
+        self._attributes = {key for key in self if isinstance(key, str) 
+                            and not hasattr(type(self), key) and key not in self._DERIVED}
+        for key in self._attributes:
+            attributes[key] = self[key]
+        self.value2key = dict(zip(self.values(), self.keys()))
+        self._sorted_items = None # Sorted by choices on first use.
+        self._choices = {} # Results of choices without force, by maximum.
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._update()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._update()
+
+    def __ior__(self, other):
+        super().__ior__(other)
+        self._update()
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._update()
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        value = super().setdefault(key, default)
+        self._update()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._update()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._update()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._update()
 
     def __getattr__(self, attr):
-        return self[attr]
+        # Only called for parameters that are not stored as instance attributes.
+        try:
+            return self[attr]
+        except KeyError:
+            raise AttributeError(attr) from None
 
-    def choices(self, force=set(), maximum=None):
+    def choices(self, force=frozenset(), maximum=None):
         """
         Returns a list of (value, key) pairs (sorted in the order of definition),
         up to a maximum value and only if the key is listed in force, if force is given.
         """     
-        member_items = sorted(self.items(), key=lambda x:x[1])
-        if force:
-            member_items = ((key, value) for key, value in member_items if key in force)
-        if maximum is not None:
-            member_items = ((key, value) for key, value in member_items if value <= maximum)
-        return [(value, key) for key, value in member_items]
+        if not force and maximum in self._choices:
+            # Without force, the result only depends on maximum, so it is cached.
+            return list(self._choices[maximum])
+        member_items = self._sorted_items
+        if member_items is None:
+            member_items = self._sorted_items = sorted(self.items(), key=itemgetter(1))
+        if not force:
+            choices = self._choices[maximum] = [(value, key) for key, value in member_items
+                                                if maximum is None or value <= maximum]
+            return list(choices)
+        if not isinstance(force, (set, frozenset)):
+            force = frozenset(force)
+        return [(value, key) for key, value in member_items 
+                if key in force and (maximum is None or value <= maximum)]
 
-    @cached_property
-    def value2key(self):
-        """
-        Returns a dictionary that maps values to keys.
-        This can be useful when one wants to store parameters in the database:
-        it is safer to store the keys than to store the values because they are less likely to change.
-        """
-        return {value:key for key, value in self.items()}
 
 #----------------------------------------------------------------------------------------------------------------------
 
@@ -58,46 +129,37 @@ class kykdict(dict):
 
     def __setitem__(self, key, val):
         """
-        When including an item in Kyks, this method makes sure that the key
-        is stored on the item as item.kyk_Kyks_key.
+        When including a KykBase item in Kyks, this method makes sure that the key
+        is stored on the item as item.kyk_Kyks_key (used by KykBase.get_absolute_url).
         """        
-        try:
+        if isinstance(val, KykBase):
             val.kyk_Kyks_key = key
-        except AttributeError:
-            pass
         super().__setitem__(key, val)
 
 Kyks = kykdict() # A dict used to store static kyks.
 # The kyks context processor makes it available in templates.
 # We use a custum dict class in order to be able to set attributes on Kyks,
 # e.g. Kyks.append
+# Kyks is not frozen once the apps are ready: kyks may still be registered later on
+# (e.g. by KykSimple or @Kyks.append in url configurations), and other modules 
+# keep references to this very object.
 
 def append2Kyks(name=None):
     """
     Decorator that adds an instance of cls to the Kyks dictionnary 
     with the given name or cls.__name__ if no name is provided.
     """
-    if isinstance(name, str):
-        # The decorator was invoked as @append2Kyks('my_name')
-        def decorating_name(cls):
-            kyk = cls()
-            kyk.kyk_identifier = name
-            Kyks[name] = kyk
-            return cls
-        return decorating_name 
-    else:
-        def decorating_class(cls):
-            name = cls.__name__
-            kyk = cls()
-            kyk.kyk_identifier = name
-            Kyks[name] = kyk
-            return cls
-        if name is None: 
-            # The decorator was invoked as @append2Kyks()
-            return decorating_class
-        else:
-            # The decorator was invoked as @append2Kyks
-            return decorating_class(cls=name)
+    if isinstance(name, type):
+        # The decorator was invoked as @append2Kyks
+        return append2Kyks()(name)
+    # The decorator was invoked as @append2Kyks() or @append2Kyks('my_name')
+    def decorator(cls):
+        key = name or cls.__name__
+        kyk = cls()
+        kyk.kyk_identifier = key
+        Kyks[key] = kyk
+        return cls
+    return decorator
 
 Kyks.append = append2Kyks 
 # Kyks.append was not defined as a method on kykdict in order to be able to use it as a decorator
@@ -120,13 +182,11 @@ class KykBase:
         """
         Return the template and context used to render the kyk with the kykin tag.
         """
-        if template is None:
-            template = self.kyk_TEMPLATE 
-            # We can not set this as a default value for the template argument
-            # because subclasses would use KykBase.kyk_TEMPLATE
-            # instead of their own kyk_TEMPLATE value.
-        kwargs.update(kyk=self)
-        return template, kwargs
+        kwargs['kyk'] = self
+        return (self.kyk_TEMPLATE if template is None else template), kwargs
+        # We can not set self.kyk_TEMPLATE as a default value for the template argument
+        # because subclasses would use KykBase.kyk_TEMPLATE
+        # instead of their own kyk_TEMPLATE value.
 
     def kyk_allowed(self, user):
         """
@@ -151,17 +211,16 @@ class KykSimple(KykBase):
         self.kyk_TEMPLATE = template
         if status is not None:
             self.kyk_STATUS = status
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        vars(self).update(kwargs)
         self.kyk_identifier = name
         Kyks[name] = self
         
     @classmethod
-    def from_string(cls, template_string, **kwargs):
+    def from_string(cls, name, template_string, **kwargs):
         """
         Creates a simple kyk from a template provided as a text string.
         """
-        return cls(Template(template_string), **kwargs)
+        return cls(name, template_from_string(template_string), **kwargs)
 
 
 #======================================================================================================================
@@ -173,7 +232,7 @@ class KykList(KykBase):
     kyk_TEMPLATE = Templates.LIST
 
     def __init__(self, Model, query=None, *, initial=dict(), use_kwargs=False,
-                 order_by_fields=[], template=None, **kwargs):
+                 order_by_fields=[], template=None, select_related=None, prefetch_related=None, **kwargs):
         """
         Model : KykModel (or if query is given, then whatever model you want to add after the list).
             The model for which to make the query.
@@ -189,13 +248,17 @@ class KykList(KykBase):
             A list of field names by which to order the query list.
         template : template object or filename, optional
             Template used to render the list. By default, Templates.LIST is used.
+        select_related, prefetch_related : iterables of field names, optional
+            Related objects to fetch along with the list, to avoid a query per row.
+            By default, Model.kyk_SELECT_RELATED and Model.kyk_PREFETCH_RELATED are used.
         **kwargs : 
             additional filter parameters to be used by query().filter 
         """
 
         self.Model = Model
-        if hasattr(Model, 'kyk_STATUS'):
-            self.kyk_STATUS = Model.kyk_STATUS
+        status = getattr(Model, 'kyk_STATUS', None)
+        if status is not None:
+            self.kyk_STATUS = status
         # query has to be callable! (Otherwise the instance would be reusing 
         # the same querylist over and over again.)
         self.query = Model.objects.all if query is None else query
@@ -204,6 +267,12 @@ class KykList(KykBase):
         if template is not None:
             self.kyk_TEMPLATE = template
         self.filters = kwargs
+        if select_related is None:
+            select_related = getattr(Model, 'kyk_SELECT_RELATED', ())
+        if prefetch_related is None:
+            prefetch_related = getattr(Model, 'kyk_PREFETCH_RELATED', ())
+        self.select_related, self.prefetch_related = tuple(select_related), tuple(prefetch_related)
+        self._kyk_add_action = self._make_add_action() # Returned by kyk_add on every render.
 
     def kyk_in(self, request, index=0, size=20, order_by_field=None, **kwargs):
         """
@@ -215,21 +284,36 @@ class KykList(KykBase):
         If no list of fields is supplied, the default ordering as defined in
         Model.Meta.ordering is used.
         """
-        index = int(request.GET.get('index', index))
-        size = int(request.GET.get('size', size))
+        GET = request.GET
+        # Malformed values in the query string are ignored, each in favour of its own default.
+        try:
+            index = int(GET.get('index', index))
+        except ValueError:
+            pass
+        try:
+            size = int(GET.get('size', size))
+        except ValueError:
+            pass
         #order_by_fields = request.GET.get('order_by_fields', order_by_fields)
-        kyk_list = self.query().filter(**self.filters) if self.filters else self.query()
-        order_by_fields = [order_by_field, ] + self.order_by_fields if order_by_field else self.order_by_fields 
+        query, filters, order_by_fields = self.query, self.filters, self.order_by_fields
+        kyk_list = query().filter(**filters) if filters else query()
+        if order_by_field:
+            order_by_fields = (order_by_field, *order_by_fields)
         if order_by_fields:
             kyk_list = kyk_list.order_by(*order_by_fields)
+        if self.select_related:
+            kyk_list = kyk_list.select_related(*self.select_related)
+        if self.prefetch_related:
+            kyk_list = kyk_list.prefetch_related(*self.prefetch_related)
         previous_index = index - size
         if previous_index < 0 < index:
             previous_index = 0
         next_index = index + size
-        if next_index < kyk_list.count():
-            kyk_list = kyk_list[index:next_index]
+        # Fetch one extra row to know whether there is a next page, instead of counting all the rows.
+        kyk_list = list(kyk_list[index:next_index + 1])
+        if len(kyk_list) > size:
+            del kyk_list[size:]
         else:
-            kyk_list = kyk_list[index:]
             next_index = 0
         kwargs.update(previous_index=previous_index,
                      next_index=next_index,
@@ -243,7 +327,13 @@ class KykList(KykBase):
     #@Action.apply()
     def kyk_add(self):
         """
-        Defines an action that adds a new kyk to the list.
+        Returns an action that adds a new kyk to the list.
+        """
+        return self._kyk_add_action
+
+    def _make_add_action(self):
+        """
+        Defines the action returned by kyk_add. It is created only once per list.
         """
         def action(request, stage=0):
             if not self.Model.kyk_create.kyk_allowed(request.user):
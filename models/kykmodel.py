@@ -1,6 +1,10 @@
 #from itertools import chain, takewhile
+import inspect
+import sys
 
 from django.db import models, IntegrityError
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 from django import forms
 from django.urls import reverse
 from django.utils import html
@@ -20,6 +24,8 @@ class KykModelIdentifier:
     Returns a string that identifies the model instance unambiguously and consistently
     with the same result if the page is loaded again after an action.
     If retrieved from the class, then kyk_Identifier is returned.
+    It is not cached on the instance: the identifier has to follow the primary key
+    (e.g. after ``obj.pk = None; obj.save()``), and making it again is hardly slower than checking a cache.
     """
   
     def __get__(self, instance, cls=None):
@@ -35,6 +41,8 @@ class KykModel(KykBase, models.Model):
 
     kyk_STATUS = Status.USER
     kyk_TEMPLATE = Templates.MODEL
+    kyk_SELECT_RELATED = () # Related fields to fetch with a join when listing kyks, e.g. ('author',)
+    kyk_PREFETCH_RELATED = () # Related fields to fetch in a separate query when listing kyks
 
     class Meta:
         abstract = True
@@ -42,27 +50,62 @@ class KykModel(KykBase, models.Model):
     def get_field_items(self, field_names=None, *args, **kwargs):
         """
         Returns a list of (field name, field value) pairs for the fields
-        listed in field_names, or for all fields if no names were given.
+        listed in field_names, or for all concrete and many-to-many fields if no names were given.
+        field_names may contain field names as well as field objects.
+        Related objects are fetched from the database unless they were loaded
+        along with the kyk, e.g. with kyk_SELECT_RELATED.
         """
         if field_names is None:
-            field_names = self._meta.get_fields(*args, **kwargs)
+            # Without arguments, only the forward fields are listed: reverse relations do not have a verbose_name.
+            if args or kwargs:
+                fields = self._meta.get_fields(*args, **kwargs)
+            else:
+                fields = [*self._meta.concrete_fields, *self._meta.many_to_many]
+        else:
+            get_field = self._meta.get_field
+            fields = [get_field(name) if isinstance(name, str) else name for name in field_names]
         return [(field.verbose_name , getattr(self, field.name)) 
-                for field in field_names]
+                for field in fields]
+
+    @classmethod
+    def kyk_queryset(cls):
+        """
+        Returns the queryset from which single kyks are fetched by the views,
+        with the related objects of kyk_SELECT_RELATED and kyk_PREFETCH_RELATED.
+        Override it to restrict the loaded columns, e.g. with only() or defer().
+        """
+        queryset = cls.objects.all()
+        if cls.kyk_SELECT_RELATED:
+            queryset = queryset.select_related(*cls.kyk_SELECT_RELATED)
+        if cls.kyk_PREFETCH_RELATED:
+            queryset = queryset.prefetch_related(*cls.kyk_PREFETCH_RELATED)
+        return queryset
 
     def get_absolute_url(self):
-        app, model = self._meta.label.split('.')
+        app, model = self.kyk_AppModel
         return reverse('kykmodel', 
                        kwargs={'app': app, 'model': model, 'pk': self.pk},
                        )
 
-    @cached_classproperty
-    def kyk_Identifier(cls):
+    @staticmethod
+    def _kyk_Identifier(cls):
         """
         Returns a string that should identify the model class unambiguously and 
         consistently with the same result if the page is loaded again after an action.
         """
         return cls._meta.label
 
+    kyk_Identifier = cached_classproperty(_kyk_Identifier, name='kyk_Identifier')
+    # prepare_kyk_model replaces it by a plain string on each concrete subclass,
+    # but class_prepared is not sent for abstract models, which keep the cached_classproperty.
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if 'kyk_Identifier' not in vars(cls):
+            # cached_classproperty stores its result on the class it is read from,
+            # so each subclass gets its own copy, lest it inherit the identifier of its parent.
+            cls.kyk_Identifier = cached_classproperty(cls._kyk_Identifier, name='kyk_Identifier')
+
     kyk_identifier = KykModelIdentifier()
     # def kyk_identifier(self):
     #     return f'{self.kyk_Identifier.lower()}-{self.pk}'
@@ -169,4 +212,25 @@ class KykModel(KykBase, models.Model):
         return Kyks['home']
 
 
+#----------------------------------------------------------------------------------------------------------------------
+
+@receiver(class_prepared)
+def prepare_kyk_model(sender, **kwargs):
+    """
+    Sets the class attributes that can be computed once the model class is ready.
+    (This can not be done in __init_subclass__, because _meta is not available yet at that point.)
+    """
+    if issubclass(sender, KykModel):
+        if isinstance(inspect.getattr_static(sender, 'kyk_Identifier'), cached_classproperty):
+            sender.kyk_Identifier = sys.intern(sender._meta.label)
+        sender.kyk_AppModel = (sender._meta.app_label, sender._meta.object_name) # Used by get_absolute_url.
+        # kyk_Form can not be computed here yet: 
+        # form fields for relations require the related models to be loaded.
+        # But each model should cache its own form class: otherwise the subclass of a concrete model
+        # would find the form class that was cached on its parent.
+        Form = inspect.getattr_static(sender, 'kyk_Form')
+        if isinstance(Form, cached_classproperty):
+            sender.kyk_Form = Form
+
+
 #======================================================================================================================
@@ -46,7 +46,7 @@ class Panel(KykBase):
         Retruns a string that identifies the self object unambiguously and consistently
         with the same result if the page is loaded again after an action.
         """
-        return "{}-{}".format(self.page.prefix, self.name)
+        return f'{self.page.prefix}-{self.name}'
             
     def get_children(self):
         """
@@ -108,7 +108,9 @@ class KykTree(MPTTModel):
         if self.is_child_node():
             # We update the timestamp on all ancestors
             # because modifying a child should also count as modifying the  parent.
-            self.get_ancestors(include_self=True).update(modification_date=timezone.now())
+            # (The timestamp of self was already set by super().save because of auto_now,
+            # unless update_fields left it out.)
+            self.get_ancestors().update(modification_date=timezone.now())
 
 
 #======================================================================================================================
@@ -149,7 +149,7 @@ class Users(KykBase):
         Show a form that allows the user to change his status.
         """
         action = 'setstatus'
-        submitter = '{}-{}'.format(self.kyk_identifier, action)
+        submitter = f'{self.kyk_identifier}-{action}'
         if (request.method == 'POST') and (submitter in request.POST):
             data = request.POST
         else:
@@ -165,7 +165,9 @@ class Users(KykBase):
 
 #======================================================================================================================
 
-def set_user_status(user, session={}):
+def set_user_status(user, session=None):
+    if session is None:
+        session = {}
     if not user.is_authenticated:
         user.max_status = Status.HUMAN if session.get('is_human', False) else Status.PUBLIC
     elif user.is_superuser:
@@ -212,9 +214,12 @@ class KykStatusForm(forms.Form):
         otherwise a KeyError will occur ('mood' not in form.cleaned_data)
         """
         status = self.cleaned_data['status']
-        if self.request.user.status != status:
-            self.request.session['status'] = status
-            set_user_status(self.request.user, self.request.session)
+        user, session = self.request.user, self.request.session
+        if user.status != status:
+            session['status'] = status
+            # The choices were limited to user.max_status, so we do not need to recompute it
+            # with set_user_status: the new status can be applied as is.
+            user.status = status
 
 
 #======================================================================================================================
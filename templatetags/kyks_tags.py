@@ -1,8 +1,8 @@
 from django import template as django_template
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.template.base import kwarg_re
 from django.utils import html
+from django.utils.safestring import SafeData
 
 from ..utils import template_from_file
 
@@ -29,6 +29,19 @@ def define(val=None):
     return val
 
 
+#----------------------------------------------------------------------------------------------------------------------
+
+@register.simple_tag
+def kyk_button_group(items, url='.', design=''):
+    """
+    Displays a row of GET buttons, one for each (action, code, label) triple in items:
+        
+        {% kyk_button_group items %}
+    """
+    from ..models.actions import KykButtonGroup # We can not import this earlier on (circular import).
+    return KykButtonGroup(items, url=url, design=design)
+
+
 #======================================================================================================================
 # kykin is a helper function for KykNode.render.
 # It has been split out as a separate function in order to improve readability.
@@ -59,7 +72,8 @@ def kykin(context, kyk,  using=None, *args, **kwargs):
         else:
             return ''
     # Check if the user has permissions to access the kyk.
-    if hasattr(kyk, 'kyk_allowed') and not kyk.kyk_allowed(request.user):
+    kyk_allowed = getattr(kyk, 'kyk_allowed', None)
+    if kyk_allowed is not None and not kyk_allowed(request.user):
         return ''
     # Generate the content from the kyk.    
     if hasattr(kyk, 'kyk_in'): # kyk is a kyk instance
@@ -83,20 +97,22 @@ def kykin(context, kyk,  using=None, *args, **kwargs):
 
 class KykNode(django_template.Node):
     
-    def __init__(self, kyk, *args, name=None, nodelist=[], **kwargs):
+    def __init__(self, kyk, *args, name=None, nodelist=None, **kwargs):
         self.kyk = kyk
-        # name and nodelist empty unless the clause 'as <name>' was used in the tag.
+        # name and nodelist are None unless the clause 'as <name>' was used in the tag.
         self.name, self.nodelist = name, nodelist
         self.args, self.kwargs = args, kwargs
 
     def render(self, context):
-        args = [arg.resolve(context) for arg in self.args]
-        kwargs = {key:value.resolve(context) for key, value in self.kwargs.items()}
+        # Most kykin tags have no arguments at all, in which case there is nothing to resolve.
+        args = [arg.resolve(context) for arg in self.args] if self.args else ()
+        kwargs = {key:value.resolve(context) for key, value in self.kwargs.items()} if self.kwargs else {}
         #result = kykin(context, self.kyk, *args, **kwargs)
         result = kykin(context, self.kyk.resolve(context), *args, **kwargs)
         # We mitigate the risk of injection attacks by escaping the result.
         # In the other branches, html.format_html and nodelist.render will apply escaping too.                    
-        result = html.conditional_escape(result)
+        if not isinstance(result, SafeData): # Rendered templates are safe already.
+            result = html.conditional_escape(result)
         if self.name and self.nodelist:
             with context.push(**{self.name: result}): # This assigns the result to a context variable with the saved name.  
                 return self.nodelist.render(context)
@@ -130,30 +146,29 @@ def do_kyk_in(parser, token):
     """
     bits = token.split_contents()
     # tag_name = bits[0]
-    kyk = parser.compile_filter(bits[1])
-    bits = bits[2:]
+    compile_filter = parser.compile_filter
+    kyk = compile_filter(bits[1])
 #   name, args, kwargs = kyk_token_kwargs(remaining_bits, parser)
     name = None
     args = []
     kwargs = {}
-    while bits:
-        bit = bits[0]
-        del bits[0]
-        if (bit == 'as') and bits:
-            name = bits[0]
-            del bits[0]
-        else:
-            match = kwarg_re.match(bit)
-            if match and match.group(1):
-                key, value = match.groups()
-                kwargs[key] = parser.compile_filter(value)
-            else: # if no match or no match.group(1):
-                args.append(parser.compile_filter(bit))
+    remaining_bits = iter(bits[2:])
+    for bit in remaining_bits:
+        if bit == 'as':
+            name = next(remaining_bits, None)
+            if name is not None:
+                continue
+            # else: a trailing 'as' is treated as a positional argument.
+        key, eq, value = bit.partition('=')
+        if eq and key.isidentifier():
+            kwargs[key] = compile_filter(value)
+        else: # a positional argument
+            args.append(compile_filter(bit))
     if name:
         nodelist = parser.parse(('endkyk',))
         parser.delete_first_token()
     else:
-        nodelist = []
+        nodelist = None
     return KykNode(kyk, name=name, nodelist=nodelist, *args, **kwargs)
 
 
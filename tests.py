@@ -1,3 +1,224 @@
-from django.test import TestCase
+import copy
+import pickle
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.db import models
+from django.http import HttpResponse
+from django.template import Context, RequestContext, Template
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from django.test.utils import isolate_apps
+
+from .exceptions import Redirection
+from .middleware import KykMiddleware
+from .models.actions import KykButtonGroup, KykGetButton
+from .templatetags.kyks_tags import KykNode
+from .utils import do_not_call_in_templates
+from .models import Status, KykModel, KykList
+from .models.base import ParameterDict
+
+
+#======================================================================================================================
+
+class KykMiddlewareTests(SimpleTestCase):
+
+    def get_user(self, path, user=None, session=None):
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser() if user is None else user
+        request.session = {} if session is None else session
+        KykMiddleware(lambda request: HttpResponse())(request)
+        return request.user
+
+    @override_settings(STATIC_URL='/static/', MEDIA_URL='')
+    def test_default_media_url(self):
+        # The default MEDIA_URL is returned as '/' by settings, which should not skip every path.
+        user = self.get_user('/page/')
+        self.assertEqual(user.max_status, Status.PUBLIC)
+        self.assertEqual(user.status, Status.PUBLIC)
+
+    @override_settings(STATIC_URL='/static/', MEDIA_URL='/media/')
+    def test_skipped_paths(self):
+        self.assertFalse(hasattr(self.get_user('/static/style.css'), 'status'))
+        self.assertFalse(hasattr(self.get_user('/media/image.png'), 'status'))
+        self.assertEqual(self.get_user('/page/').status, Status.PUBLIC)
+
+    def test_status_follows_user_and_session(self):
+        # The status is resolved on every request, so changes take effect immediately.
+        user = get_user_model()(username='staff', is_staff=True)
+        self.assertEqual(self.get_user('/page/', user).max_status, Status.AGENT)
+        user.is_staff = False
+        self.assertEqual(self.get_user('/page/', user).max_status, Status.USER)
+        self.assertEqual(self.get_user('/page/', session={'is_human': True}).max_status, Status.HUMAN)
+
+
+#======================================================================================================================
+
+class RedirectionTests(SimpleTestCase):
+
+    def test_copy_and_pickle_keep_kwargs(self):
+        redirection = Redirection('/a', permanent=True)
+        for clone in (copy.copy(redirection), pickle.loads(pickle.dumps(redirection))):
+            self.assertEqual(clone.args, ('/a',))
+            self.assertEqual(clone.kwargs, {'permanent': True})
+
+
+#======================================================================================================================
+
+class ParameterDictTests(SimpleTestCase):
+
+    def test_mutations_after_choices(self):
+        parameters = ParameterDict('A', 'B', 'C')
+        self.assertEqual(parameters.choices(), [(1, 'A'), (2, 'B'), (3, 'C')])
+        self.assertEqual(parameters.choices(maximum=2), [(1, 'A'), (2, 'B')])
+        parameters['D'] = 0
+        self.assertEqual(parameters.choices(maximum=2), [(0, 'D'), (1, 'A'), (2, 'B')])
+        parameters.update(B=5)
+        self.assertEqual(parameters.B, 5)
+        self.assertEqual(parameters.value2key[5], 'B')
+        self.assertEqual(parameters.choices(), [(0, 'D'), (1, 'A'), (3, 'C'), (5, 'B')])
+        del parameters['A']
+        self.assertRaises(AttributeError, getattr, parameters, 'A')
+        self.assertNotIn(1, parameters.value2key)
+        self.assertEqual(parameters.pop('C'), 3)
+        self.assertFalse(hasattr(parameters, 'C'))
+        self.assertEqual(parameters.setdefault('E', 4), 4)
+        self.assertEqual(parameters.E, 4)
+        parameters |= {'F': 6}
+        self.assertEqual(parameters.F, 6)
+        self.assertEqual(parameters.popitem(), ('F', 6))
+        self.assertEqual(parameters.choices(), [(0, 'D'), (4, 'E'), (5, 'B')])
+        parameters.clear()
+        self.assertEqual(parameters.choices(), [])
+        self.assertFalse(hasattr(parameters, 'B'))
+
+    def test_copy_and_pickle(self):
+        parameters = ParameterDict('A', 'B')
+        parameters.choices()
+        for clone in (copy.copy(parameters), copy.deepcopy(parameters), pickle.loads(pickle.dumps(parameters))):
+            self.assertEqual(clone, {'A': 1, 'B': 2})
+            self.assertEqual(clone.B, 2)
+            self.assertEqual(clone.value2key, {1: 'A', 2: 'B'})
+            self.assertEqual(clone.choices(), [(1, 'A'), (2, 'B')])
+            clone['C'] = 3
+            self.assertEqual(clone.choices(), [(1, 'A'), (2, 'B'), (3, 'C')])
+            self.assertFalse(hasattr(parameters, 'C'))
+
+    def test_method_names_are_not_overwritten(self):
+        parameters = ParameterDict(items=1, value2key=2)
+        self.assertEqual(parameters['items'], 1)
+        self.assertTrue(callable(parameters.items))
+        self.assertEqual(parameters.value2key, {1: 'items', 2: 'value2key'})
+
+
+#======================================================================================================================
+
+@isolate_apps('kyks')
+class KykModelTests(SimpleTestCase):
+
+    def test_identifier_follows_pk(self):
+        class Thing(KykModel):
+            pass
+        thing = Thing(pk=1)
+        self.assertEqual(thing.kyk_identifier, 'kyks.Thing-1')
+        thing.pk = None # As when copying with obj.pk = None; obj.save(), or after delete().
+        self.assertEqual(thing.kyk_identifier, 'kyks.Thing-None')
+        thing.pk = 2
+        self.assertEqual(thing.kyk_identifier, 'kyks.Thing-2')
+
+    def test_identifier_of_abstract_models(self):
+        class AbstractThing(KykModel):
+            class Meta:
+                abstract = True
+        class Thing(AbstractThing):
+            pass
+        self.assertEqual(KykModel.kyk_Identifier, 'kyks.KykModel')
+        self.assertEqual(AbstractThing.kyk_identifier, 'kyks.AbstractThing')
+        self.assertEqual(Thing.kyk_identifier, 'kyks.Thing')
+        self.assertEqual(Thing(pk=1).kyk_identifier, 'kyks.Thing-1')
+        class Custom(KykModel):
+            kyk_Identifier = 'custom'
+        self.assertEqual(Custom(pk=1).kyk_identifier, 'custom-1')
+
+    def test_list_ignores_malformed_query_parameters_separately(self):
+        class Thing(KykModel):
+            pass
+        kyk_list = KykList(Thing, query=lambda: list(range(30)))
+        def listed(query_string):
+            template, context = kyk_list.kyk_in(RequestFactory().get('/' + query_string))
+            return context['kyk_list']
+        self.assertEqual(listed('?index=x&size=2'), [0, 1])
+        self.assertEqual(listed('?index=4&size=x'), list(range(4, 24)))
+        self.assertEqual(listed('?index=4&size=2'), [4, 5])
+
+    def test_field_items_include_many_to_many(self):
+        class Thing(KykModel):
+            name = models.CharField(max_length=20)
+            related = models.ManyToManyField('self')
+        items = dict(Thing(pk=1, name='thing').get_field_items())
+        self.assertEqual(items['name'], 'thing')
+        self.assertIn('related', items)
+        self.assertEqual(list(dict(Thing(pk=1).get_field_items(['name']))), ['name'])
+
+
+#======================================================================================================================
+
+class KykButtonGroupTests(SimpleTestCase):
+
+    items = [('edit_item', 1, None), ('delete', 'a&b', '<b>')]
+
+    def test_default_label(self):
+        self.assertIn('>Edit Item</a>', KykButtonGroup(self.items))
+
+    def test_escaping(self):
+        html = KykButtonGroup(self.items, url='/list/?x=1&y=2', design='"big"')
+        self.assertIn('&lt;b&gt;', html)
+        self.assertNotIn('<b>', html)
+        self.assertIn('delete=a%26b', html)
+        self.assertIn('&amp;y=2', html)
+        self.assertIn('&quot;big&quot;', html)
+        self.assertNotIn('"big"', html)
+
+    def test_same_as_separate_buttons(self):
+        self.assertEqual(KykButtonGroup(self.items), 
+                         ''.join(KykGetButton(action, code, label) for action, code, label in self.items))
+
+    def test_template_tag(self):
+        html = Template('{% load kyks_tags %}{% kyk_button_group items %}').render(Context({'items': self.items}))
+        self.assertEqual(html, KykButtonGroup(self.items))
+
+
+#======================================================================================================================
+
+class KykInTagTests(SimpleTestCase):
+
+    def parse(self, tag):
+        nodes = Template('{% load kyks_tags %}' + tag).nodelist.get_nodes_by_type(KykNode)
+        self.assertEqual(len(nodes), 1)
+        node = nodes[0]
+        return ([arg.token for arg in node.args], {key: value.token for key, value in node.kwargs.items()}, 
+                node.name, node.nodelist)
+
+    def test_keyword_and_positional_arguments(self):
+        self.assertEqual(self.parse('{% kykin kyk a=1 b %}'), (['b'], {'a': '1'}, None, None))
+
+    def test_positional_arguments_with_equal_signs(self):
+        args, kwargs, name, nodelist = self.parse('{% kykin kyk "x=y" v|default:"a=b" c="d=e" %}')
+        self.assertEqual(args, ['"x=y"', 'v|default:"a=b"'])
+        self.assertEqual(kwargs, {'c': '"d=e"'})
+
+    def test_as_name(self):
+        args, kwargs, name, nodelist = self.parse('{% kykin kyk a=1 as result %}[{{ result }}]{% endkyk %}')
+        self.assertEqual((args, kwargs, name), ([], {'a': '1'}, 'result'))
+        self.assertIsNotNone(nodelist)
+        echo = do_not_call_in_templates(lambda request, **kwargs: f"<{kwargs['a']}>")
+        context = RequestContext(RequestFactory().get('/'), {'kyk': echo})
+        context.request.user = AnonymousUser()
+        html = Template('{% load kyks_tags %}{% kykin kyk a=1 as result %}[{{ result }}]{% endkyk %}').render(context)
+        self.assertEqual(html, '[&lt;1&gt;]')
+
+    def test_trailing_as(self):
+        # A trailing 'as' has no name to follow it, so it is a positional argument and no endkyk is expected.
+        self.assertEqual(self.parse('{% kykin kyk as %}'), (['as'], {}, None, None))
+
+
+#======================================================================================================================
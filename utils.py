@@ -2,11 +2,17 @@
 Some general-purpose classes, functions and/or decorators that might be useful for other apps as well.
 """
 
+from functools import lru_cache
+from operator import attrgetter
+
 from django import forms as django_forms
 from django.conf import settings
+from django.core.signals import setting_changed
 from django.db import models as django_models
+from django.dispatch import receiver
 from django.template import Template
 from django.template.loader import get_template
+from django.utils.autoreload import file_changed
 #from django.utils.safestring import mark_safe
 
 #======================================================================================================================
@@ -48,27 +54,37 @@ class Choices:
     def __init__(self, max_length, *args, **kwargs):
         self.max_length = max_length
         separator = '-'*max_length
-        expanded_args = [(arg[0][:max_length], arg[-2], arg[-1]) for arg in args]
-        self.name2code = {name: code for code, name, label in expanded_args}
-        self.name2label = {name: label for code, name, label in expanded_args}
-        self.code2label = {code: label for code, name, label in expanded_args}
-        self.code2name = {code: name for code, name, label in expanded_args}
-        if settings.DEBUG:
-            # Check for repeated codes. The separator code may appear several times
-            # but other codes only once.
-            if len(set(code for code, name, label in expanded_args if code != separator)
-                   ) + len(list(code for code, name, label in expanded_args if code == separator)
-                           ) != len(args):
-                raise KeyError
-        self.choices = [((None, SEPARATOR) if code == separator else (code, label))
-                        for code, name, label in expanded_args]
-        self.keys =  [code for code, name, label in expanded_args if code != separator]
+        self.name2code, self.name2label, self.code2label, self.code2name = {}, {}, {}, {}
+        self.choices, self.keys = [], []
+        for arg in args:
+            code, name, label = arg[0][:max_length], arg[-2], arg[-1]
+            if code == separator:
+                # The separator code may appear several times but other codes only once.
+                self.choices.append((None, SEPARATOR))
+            else:
+                if settings.DEBUG and code in self.code2name:
+                    raise KeyError(code)
+                self.choices.append((code, label))
+                self.keys.append(code)
+            self.name2code[name] = code
+            self.name2label[name] = label
+            self.code2label[code] = label
+            self.code2name[code] = name
+        # The choice names are stored as instance attributes, such that STATES.ACTIVE
+        # does not have to go through __getattr__. Existing attributes are not overwritten.
+        for name, code in self.name2code.items():
+            if name.isidentifier() and not hasattr(type(self), name) and name not in vars(self):
+                vars(self)[name] = code
         # Set optional arguments.
         for key, value in kwargs.items():
             setattr(self, key, value)
         
     def __getattr__(self, name):
-        return self.name2code[name] if name in self.name2code else super().__getattribute__(name)
+        # Only called for choice names that are not stored as instance attributes.
+        try:
+            return vars(self)['name2code'][name]
+        except KeyError:
+            raise AttributeError(name) from None
 
     def __iter__(self):
         return self.choices.__iter__()
@@ -91,14 +107,44 @@ class Choices:
         
 #======================================================================================================================
 
+@lru_cache(maxsize=1024)
+def cached_get_template(filename):
+    """
+    Returns the same result as django.template.loader.get_template, 
+    but the result is cached, such that the template loaders are only consulted once per file.
+    """
+    return get_template(filename)
+
 def template_from_file(filename):
     """
     Returns a Django template object created from the contents of a file.
     """
-    return get_template(filename).template
+    return cached_get_template(filename).template
     # get_template returns a template enginge object whose template attribute is the
     # Template object that we want.
 
+@receiver(file_changed)
+@receiver(setting_changed)
+def forget_templates_from_file(sender, **kwargs):
+    """
+    Clears the cache of cached_get_template when the autoreloader of the development server
+    notices a changed file or when settings are overridden (e.g. in tests), 
+    such that edited or reconfigured templates are picked up.
+    """
+    cached_get_template.cache_clear()
+    # Returning None lets the autoreloader decide whether to restart the server.
+
+
+#----------------------------------------------------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def template_from_string(template_string):
+    """
+    Returns a Django template object compiled from a string.
+    Each distinct string is only compiled once: the template objects are shared.
+    """
+    return Template(template_string)
+
 
 #----------------------------------------------------------------------------------------------------------------------
 
@@ -170,7 +216,7 @@ class cached_classproperty:
     def __init__(self, method, name=None):
         self.method = method
         self.name = name or method.__name__
-        self.__doc__ = getattr(method, '__doc__', "Cached class property of method {}".format(self.name))
+        self.__doc__ = getattr(method, '__doc__', None) or f"Cached class property of method {self.name}"
         # Should we copy other attributes from vars(method)?
 
     def __get__(self, instance, cls=None):
@@ -187,7 +233,7 @@ def get_derived_classes(cls, include_self=True):
     """
     if include_self:
         yield cls
-    for subcls in sorted(cls.__subclasses__(), key=lambda x: x.__name__):
+    for subcls in sorted(cls.__subclasses__(), key=attrgetter('__name__')):
         yield from get_derived_classes(subcls)
 
 
@@ -1,9 +1,14 @@
+from functools import lru_cache
+
 from django.apps import apps
-from django.http import Http404
+from django.http import Http404, HttpResponse, QueryDict
 from django.shortcuts import render
 
-from .exceptions import Reload, ReloadAsGet
+from .exceptions import Reload
 from .models import Templates, Kyks, KykList, KykModel
+from .utils import cached_get_template
+
+EMPTY_QUERYDICT = QueryDict() # Immutable, so it can be shared by all requests that are reloaded as GET.
 
 
 #======================================================================================================================
@@ -40,31 +45,55 @@ def KykModelView(arg=None, template=Templates.PAGE):
     By default, the ``Templates.PAGE`` template will be used for rendering,
     unless another template is provided.
     """
-    if isinstance(arg, type) and issubclass(arg, KykModel):
+    if arg is None:
+        def view(request, app, model, pk=None, **kwargs):
+            kykModel = _get_model(app, model)
+            return kyk_render(request, kykModel, pk=pk, template=template, **kwargs)
+    elif isinstance(arg, type) and issubclass(arg, KykModel):
         kykModel = arg
         def view(request, pk=None, **kwargs):
             return kyk_render(request, kykModel, pk=pk, template=template, **kwargs)
-    elif apps.is_installed(arg): # arg is the name of an app:
+    elif isinstance(arg, str) and apps.is_installed(arg): # arg is the name of an app:
         app = arg
         def view(request, model, pk=None, **kwargs):
-            kykModel = apps.get_model(app, model)
-            return kyk_render(request, kykModel, pk=pk, template=template, **kwargs)
-    elif arg is None:
-        def view(request, app, model, pk=None, **kwargs):
-            kykModel = apps.get_model(app, model)
+            kykModel = _get_model(app, model)
             return kyk_render(request, kykModel, pk=pk, template=template, **kwargs)
     else: # arg is a regular kyk or the key pointing to a regular kyk in Kyks
         return KyksView(arg=arg, template=template)
     return view
 
 
+#----------------------------------------------------------------------------------------------------------------------
+
+@lru_cache(maxsize=256)
+def _get_model(app, model):
+    """
+    Cached version of apps.get_model: the app registry does not change once the apps are ready.
+    """
+    return apps.get_model(app, model)
+
+
+#----------------------------------------------------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def _get_list(kykModel):
+    """
+    Returns the list kyk of kykModel. 
+    A KykList holds no per-request state (its queries are made in kyk_in), so it can be shared.
+    """
+    return KykList(kykModel)
+
+
 #----------------------------------------------------------------------------------------------------------------------
 
 def kyk_render(request, kykModel, pk=None, **kwargs):
     """
     View that renders a specific kyk or a list of kyks from the given model.
     """
-    kyk = KykList(kykModel) if pk is None else kykModel.objects.get(pk=pk)
+    if pk is None:
+        kyk = _get_list(kykModel)
+    else:
+        kyk = getattr(kykModel, 'kyk_queryset', kykModel.objects.all)().get(pk=pk)
     return safe_render(request, kyk, **kwargs)
 
 
@@ -75,19 +104,22 @@ def safe_render(request, kyk, template, *, RELOADS=3, **kwargs):
     Render the request using a template with the kyk in its context. 
     The rendering is tried ``RELOADS`` times in order to catch redirections.
     """
-    for it in range(RELOADS):
-        kwargs.update(kyk=kyk)
+    kwargs['kyk'] = kyk # The context is built once, only its kyk is replaced upon a reload.
+    reloads_left = RELOADS
+    while True:
         try:
-            return render(request, template, context=kwargs)
-        except ReloadAsGet as reload:
-            request.method = 'GET'
-            request.POST = {}
-            kyk, template = reload.kyk or kyk, reload.template or template
+            if isinstance(template, str):
+                return HttpResponse(cached_get_template(template).render(kwargs, request))
+            return render(request, template, context=kwargs) # e.g. a list of template names
         except Reload as reload:
-            kyk, template = reload.kyk or kyk, reload.template or template
-    else: # for it in range(RELOADS):
-        # If render did not work like it should after 3 iterations, then show the error page.
-        raise Http404()
+            if reload.as_get: # e.g. ReloadAsGet
+                request.method = 'GET'
+                request.POST = EMPTY_QUERYDICT
+            kwargs['kyk'], template = reload.kyk or kwargs['kyk'], reload.template or template
+        reloads_left -= 1
+        if reloads_left <= 0:
+            # If render did not work like it should after RELOADS attempts, then show the error page.
+            raise Http404()
 
 
 #======================================================================================================================